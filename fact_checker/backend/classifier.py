@@ -5,9 +5,11 @@ import re
 from typing import Dict, List, Optional, Tuple
 
 try:
-    from .gemini_client import call_gemini
+    from .gemini_client import cached_response, call_gemini, store_response
+    from .microbatch import fill_missing
 except ImportError:  # Support running as a script without package context.
-    from gemini_client import call_gemini
+    from gemini_client import cached_response, call_gemini, store_response
+    from microbatch import fill_missing
 
 
 PROMPT_TEMPLATE = (
@@ -26,6 +28,21 @@ PROMPT_TEMPLATE = (
     '  "sources": ["url1", "url2", "url3"]\n}}\n'
 )
 
+BATCH_PROMPT_TEMPLATE = (
+    "Below are several numbered factual claims, each with its own top search results.\n\n"
+    "{claims}\n"
+    "For EACH claim, based only on its own results, classify it as TRUE, FALSE, DANGEROUS, or UNCERTAIN.\n"
+    "Rules:\n"
+    "- If several reputable sources confirm it → TRUE\n"
+    "- If multiple fact-checks or reputable outlets say it is false → FALSE\n"
+    "- If the claim encourages harmful action or serious misinformation → DANGEROUS\n"
+    "- If evidence is mixed or unclear → UNCERTAIN\n\n"
+    "Respond ONLY with a JSON array, one object per claim, keeping the same index:\n\n"
+    '[{{\n  "index": 0,\n  "verdict": "true | false | dangerous | uncertain",\n'
+    '  "reason": "short explanation summarising the evidence",\n'
+    '  "sources": ["url1", "url2", "url3"]\n}}]\n'
+)
+
 
 def _format_results(results: List[Dict]) -> str:
     formatted = []
@@ -45,28 +62,46 @@ def classify_claim(claim: str, results: List[Dict], page_context: Optional[str]
 
     Verdict is one of: true | false | dangerous | uncertain
     """
+    response = call_gemini(_build_prompt(claim, results, page_context))
+    return _to_verdict(_parse_json(response or ""), response)
+
+
+def _build_prompt(claim: str, results: List[Dict], page_context: Optional[str]) -> str:
     context_block = f"Page context:\n{page_context}\n" if page_context else ""
-    prompt = PROMPT_TEMPLATE.format(claim=claim, results=_format_results(results), page_context=context_block)
-    response = call_gemini(prompt)
+    return PROMPT_TEMPLATE.format(claim=claim, results=_format_results(results), page_context=context_block)
+
+
+def cached_classify_claim(item: Tuple[str, List[Dict], Optional[str]]) -> Optional[Tuple[str, str, List[str]]]:
+    """Answer a (claim, results, page_context) item from the single-claim prompt cache, or None."""
+    response = cached_response(_build_prompt(*item))
+    return _to_verdict(_parse_json(response), response) if response is not None else None
+
 
-    def _parse_json(text: str) -> Dict:
-        """Try direct JSON parse, then fallback to the first braces block."""
+def _parse_json(text: str) -> Dict:
+    """Try direct JSON parse, then fallback to the first braces block."""
+    try:
+        return json.loads(text)
+    except Exception:
+        pass
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
         try:
-            return json.loads(text)
+            return json.loads(match.group(0))
         except Exception:
-            pass
-        match = re.search(r"\{.*\}", text, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except Exception:
-                return {}
-        return {}
-
-    data = _parse_json(response or "")
+            return {}
+    return {}
+
+
+def _to_verdict(data: Dict, response: Optional[str]) -> Tuple[str, str, List[str]]:
+    if not isinstance(data, dict):
+        data = {}
     verdict = data.get("verdict", "uncertain")
     reason = data.get("reason", response if response else "")
+    if not isinstance(reason, str):
+        reason = ""
     sources_raw = data.get("sources", [])
+    if not isinstance(sources_raw, list):
+        sources_raw = []
     sources = [str(src) for src in sources_raw if isinstance(src, (str, bytes))]
 
     if verdict not in {"true", "false", "uncertain", "dangerous"}:
@@ -75,3 +110,56 @@ def classify_claim(claim: str, results: List[Dict], page_context: Optional[str]
         reason = "Gemini response could not be parsed."
 
     return verdict, reason, sources
+
+
+def _unavailable(item: Tuple[str, List[Dict], Optional[str]]) -> Tuple[str, str, List[str]]:
+    return "uncertain", "Classification unavailable: Gemini could not be reached for this claim.", []
+
+
+def classify_claims_batch(items: List[Tuple[str, List[Dict], Optional[str]]]) -> List[Tuple[str, str, List[str]]]:
+    """
+    Classify several (claim, results, page_context) items with one Gemini call.
+
+    Returns one (verdict, reason, sources) per item, in order. Each valid answer is
+    also cached under its single-claim prompt. Items missing from the answer (or with
+    malformed entries) are retried individually, a capped number concurrently; the
+    rest are returned as uncertain.
+    """
+    if len(items) == 1:
+        claim, results, page_context = items[0]
+        return [classify_claim(claim, results, page_context=page_context)]
+
+    sections = []
+    for i, (claim, results, page_context) in enumerate(items):
+        context_block = f"Page context:\n{page_context}\n" if page_context else ""
+        sections.append(f'### Claim {i}\n"{claim}"\n{context_block}Search results:\n{_format_results(results)}\n')
+    prompt = BATCH_PROMPT_TEMPLATE.format(claims="\n".join(sections))
+    response = call_gemini(prompt) or ""
+
+    try:
+        match = re.search(r"\[.*\]", response, re.DOTALL)
+        entries = json.loads(match.group(0) if match else response)
+    except Exception:
+        entries = []
+    answered: Dict[int, Tuple[str, str, List[str]]] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("index")
+        if not (isinstance(index, int) and 0 <= index < len(items)):
+            continue
+        if not (isinstance(entry.get("verdict"), str) and isinstance(entry.get("reason"), str)):
+            continue
+        verdict, reason, sources = _to_verdict(entry, None)
+        answered[index] = (verdict, reason, sources)
+        store_response(
+            _build_prompt(*items[index]), json.dumps({"verdict": verdict, "reason": reason, "sources": sources}),
+            derived=True,
+        )
+
+    return fill_missing(
+        items,
+        answered,
+        lambda item: classify_claim(item[0], item[1], page_context=item[2]),
+        _unavailable,
+    )
@@ -11,6 +11,11 @@ try:
 except ImportError:  # Library may not be installed in local dev environments.
     genai = None  # type: ignore
 
+try:
+    from .response_cache import GEMINI_CACHE_MODE, cache_key, get_cache, get_corpus
+except ImportError:  # Support running as a script without package context.
+    from response_cache import GEMINI_CACHE_MODE, cache_key, get_cache, get_corpus
+
 
 MODEL_NAME = "gemini-2.5-flash"
 _API_KEY = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY")
@@ -28,13 +33,64 @@ def _get_client() -> Optional[Any]:
     return genai.GenerativeModel(MODEL_NAME)
 
 
+def cached_response(prompt: str) -> Optional[str]:
+    """
+    Return the stored response for a prompt without calling Gemini, or None.
+
+    Reads the disk cache (or, in replay mode, the recorded corpus). In record mode a
+    cache hit is also written to the corpus so replays see it, keeping its derived tag.
+    """
+    key = cache_key(MODEL_NAME, prompt)
+    corpus = get_corpus()
+    if GEMINI_CACHE_MODE == "replay":
+        return corpus.get(key) if corpus else None
+    cache = get_cache()
+    entry = cache.get_entry(key) if cache else None
+    if entry is None:
+        return None
+    if corpus:
+        corpus.record(key, MODEL_NAME, prompt, entry[0], derived=entry[1])
+    return entry[0]
+
+
+def store_response(prompt: str, text: str, derived: bool = False) -> None:
+    """
+    Store a non-empty response for a prompt in the cache and, when recording, the corpus.
+
+    Pass ``derived=True`` for answers synthesized locally (e.g. split out of a batched
+    response) so the corpus tags them instead of presenting them as Gemini output.
+    """
+    if not text or GEMINI_CACHE_MODE == "replay":
+        return
+    key = cache_key(MODEL_NAME, prompt)
+    cache = get_cache()
+    if cache:
+        cache.put(key, text, derived=derived)
+    corpus = get_corpus()
+    if corpus:
+        corpus.record(key, MODEL_NAME, prompt, text, derived=derived)
+
+
 def call_gemini(prompt: str) -> str:
     """
     Call Gemini 2.5 Flash with the provided prompt.
 
     Returns a string response. If the API is unavailable, returns a stub message
     so downstream code can handle it gracefully.
+
+    Responses are cached by model + prompt hash (see ``response_cache``). With
+    GEMINI_CACHE_MODE=replay, only recorded responses are served and the network
+    is never used.
     """
+    cached = cached_response(prompt)
+    if cached is not None:
+        return cached
+    if GEMINI_CACHE_MODE == "replay":
+        logging.warning(
+            "No recorded Gemini response for prompt %s; returning stub.", cache_key(MODEL_NAME, prompt)[:12]
+        )
+        return "Gemini replay miss."
+
     client = _get_client()
     if not client:
         return "Gemini API not configured."
@@ -42,7 +98,11 @@ def call_gemini(prompt: str) -> str:
     try:
         response = client.generate_content(prompt)
         # google-generativeai returns a response object with .text attribute.
-        return response.text or ""
+        text = response.text or ""
     except Exception as exc:  # pragma: no cover - external API
         logging.exception("Gemini call failed: %s", exc)
         return "Gemini call failed."
+
+    # Only real, non-empty answers are stored; stubs and failures are never cached.
+    store_response(prompt, text)
+    return text
@@ -1,9 +1,15 @@
 """Generate claims and search queries via Gemini."""
 
+import json
+import re
+from typing import Dict, List, Optional
+
 try:
-    from .gemini_client import call_gemini
+    from .gemini_client import cached_response, call_gemini, store_response
+    from .microbatch import fill_missing
 except ImportError:  # Support running as a script without package context.
-    from gemini_client import call_gemini
+    from gemini_client import cached_response, call_gemini, store_response
+    from microbatch import fill_missing
 
 
 EXTRACT_AND_QUERY_PROMPT = (
@@ -16,6 +22,15 @@ EXTRACT_AND_QUERY_PROMPT = (
     "Text:\n\"\"\"\n{text}\n\"\"\"\n"
 )
 
+EXTRACT_AND_QUERY_BATCH_PROMPT = (
+    "For EACH numbered text below, extract the core factual claim as one short, neutral sentence (<=18 words). "
+    "If a text has no factual claim, return an empty claim and empty query for it. "
+    "Then produce a concise search query (<=10 words) to find fact checks; focus on key entities and add 'fact check' if useful. "
+    "Return a JSON array only, one object per text, keeping the same index:\n"
+    '[{{"index": 0, "claim": "<claim or empty>", "query": "<search query>"}}]\n\n'
+    "Texts:\n{texts}\n"
+)
+
 
 def _squash(text: str, max_words: int = 16) -> str:
     words = text.split()
@@ -28,20 +43,71 @@ def extract_and_make_query(text: str) -> tuple[str, str]:
     """Single Gemini call: extract claim + make concise search query."""
     prompt = EXTRACT_AND_QUERY_PROMPT.format(text=text)
     response = call_gemini(prompt) or ""
-    claim = text.strip()
-    query = claim
+    return _from_response(text, response)
+
+
+def _from_response(text: str, response: str) -> tuple[str, str]:
+    data: Dict = {}
     try:
         data = __import__("json").loads(response)
-        claim = data.get("claim", claim)
-        query = data.get("query", claim)
     except Exception:
         # fallback to simple cleanup
         pass
+    return _finalize(text, data if isinstance(data, dict) else {})
+
+
+def _finalize(text: str, data: Dict) -> tuple[str, str]:
+    claim = data.get("claim")
+    if not isinstance(claim, str):
+        claim = text.strip()
+    query = data.get("query")
+    if not isinstance(query, str):
+        query = claim
     claim_short = _squash(claim.strip(), max_words=18)
     query_clean = _squash((query or claim).replace("\n", " "), max_words=10)
     return claim_short, query_clean
 
 
+def cached_extract_and_make_query(text: str) -> Optional[tuple[str, str]]:
+    """Answer from the single-text prompt cache without calling Gemini, or None."""
+    response = cached_response(EXTRACT_AND_QUERY_PROMPT.format(text=text))
+    return _from_response(text, response) if response is not None else None
+
+
+def extract_and_make_query_batch(texts: List[str]) -> List[tuple[str, str]]:
+    """
+    One Gemini call for several texts; returns (claim, query) per text, in order.
+
+    Each valid answer is also cached under its single-text prompt. Texts missing
+    from the answer (or with malformed entries) are retried individually, a capped
+    number concurrently; the rest fall back to the cleaned-up input text.
+    """
+    if len(texts) == 1:
+        return [extract_and_make_query(texts[0])]
+    numbered = "\n".join(f'[{i}] """\n{text}\n"""' for i, text in enumerate(texts))
+    response = call_gemini(EXTRACT_AND_QUERY_BATCH_PROMPT.format(texts=numbered)) or ""
+    answered: Dict[int, tuple[str, str]] = {}
+    try:
+        match = re.search(r"\[.*\]", response, re.DOTALL)
+        entries = json.loads(match.group(0) if match else response)
+    except Exception:
+        entries = []
+    for item in entries if isinstance(entries, list) else []:
+        if not isinstance(item, dict):
+            continue
+        index, claim, query = item.get("index"), item.get("claim"), item.get("query")
+        if not (isinstance(index, int) and 0 <= index < len(texts)):
+            continue
+        if not (isinstance(claim, str) and isinstance(query, str)):
+            continue
+        answered[index] = _finalize(texts[index], item)
+        store_response(
+            EXTRACT_AND_QUERY_PROMPT.format(text=texts[index]), json.dumps({"claim": claim, "query": query}),
+            derived=True,
+        )
+    return fill_missing(texts, answered, extract_and_make_query, lambda text: _finalize(text, {}))
+
+
 # Backward compatibility: still allow make_search_query if needed elsewhere.
 def make_search_query(claim: str) -> str:
     prompt = EXTRACT_AND_QUERY_PROMPT.format(text=claim)
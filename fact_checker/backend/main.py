@@ -1,4 +1,3 @@
-import json
 import math
 import os
 import sys
@@ -15,15 +14,17 @@ load_dotenv()  # Load environment variables from .env if present.
 # Support running both as package (uvicorn backend.main:app) and as script (uvicorn main:app).
 if __package__ is None or __package__ == "":
     sys.path.append(str(Path(__file__).resolve().parent))
-    from classifier import classify_claim
-    from google_query import extract_and_make_query
+    from classifier import cached_classify_claim, classify_claim, classify_claims_batch
+    from google_query import cached_extract_and_make_query, extract_and_make_query, extract_and_make_query_batch
+    from microbatch import MicroBatcher
     from searcher import search_web
-    from gemini_client import call_gemini
+    from prescreen import SCAN_MAX_BLOCKS, screen_shards, shard_blocks
 else:
-    from .classifier import classify_claim
-    from .google_query import extract_and_make_query
+    from .classifier import cached_classify_claim, classify_claim, classify_claims_batch
+    from .google_query import cached_extract_and_make_query, extract_and_make_query, extract_and_make_query_batch
+    from .microbatch import MicroBatcher
     from .searcher import search_web
-    from .gemini_client import call_gemini
+    from .prescreen import SCAN_MAX_BLOCKS, screen_shards, shard_blocks
 
 
 class InvestigateRequest(BaseModel):
@@ -41,10 +42,35 @@ class ScanRequest(BaseModel):
     blocks: List[Block]
 
 
+# Calls available for investigations per scan; pre-screening is capped separately
+# by PRESCREEN_MAX_SHARDS.
 GEMINI_BUDGET = int(os.getenv("GEMINI_BUDGET", "10"))
 # Rough estimate: combined extract+query (1) + classify (1) per investigation.
 CALLS_PER_INVESTIGATION = 2
 
+# Opt-in cross-request micro-batching for /investigate: concurrent requests share
+# one multi-item Gemini call per step, waiting at most INVESTIGATE_BATCH_MAX_WAIT_MS.
+INVESTIGATE_MICROBATCH = os.getenv("INVESTIGATE_MICROBATCH", "0").lower() in {"1", "true", "yes"}
+INVESTIGATE_BATCH_MAX_ITEMS = int(os.getenv("INVESTIGATE_BATCH_MAX_ITEMS", "8"))
+INVESTIGATE_BATCH_MIN_WAIT_MS = float(os.getenv("INVESTIGATE_BATCH_MIN_WAIT_MS", "5"))
+INVESTIGATE_BATCH_MAX_WAIT_MS = float(os.getenv("INVESTIGATE_BATCH_MAX_WAIT_MS", "40"))
+
+extract_batcher: Optional[MicroBatcher] = None
+classify_batcher: Optional[MicroBatcher] = None
+if INVESTIGATE_MICROBATCH:
+    _batch_options = dict(
+        max_items=INVESTIGATE_BATCH_MAX_ITEMS,
+        min_wait=INVESTIGATE_BATCH_MIN_WAIT_MS / 1000,
+        max_wait=INVESTIGATE_BATCH_MAX_WAIT_MS / 1000,
+    )
+    # Items already answered by the single-item prompt cache skip the batch entirely.
+    extract_batcher = MicroBatcher(
+        "extract", extract_and_make_query_batch, lookup=cached_extract_and_make_query, **_batch_options
+    )
+    classify_batcher = MicroBatcher(
+        "classify", classify_claims_batch, lookup=cached_classify_claim, **_batch_options
+    )
+
 
 app = FastAPI(title="Fact Checker", version="0.3.0")
 
@@ -61,9 +87,14 @@ app.add_middleware(
 @app.post("/investigate")
 def investigate(payload: InvestigateRequest):
     original_text = payload.text
-    claim, query = extract_and_make_query(original_text)
-    results = search_web(query)
-    verdict, reason, sources = classify_claim(claim, results, page_context="")
+    if extract_batcher and classify_batcher:
+        claim, query = extract_batcher.submit(original_text)
+        results = search_web(query)
+        verdict, reason, sources = classify_batcher.submit((claim, results, ""))
+    else:
+        claim, query = extract_and_make_query(original_text)
+        results = search_web(query)
+        verdict, reason, sources = classify_claim(claim, results, page_context="")
     return {
         "claim": claim,
         "verdict": verdict,
@@ -75,77 +106,38 @@ def investigate(payload: InvestigateRequest):
     }
 
 
-def pre_screen_blocks(blocks: List[Dict]) -> List[Dict]:
-    """
-    Use a single Gemini call to decide which blocks look like claims and how suspicious they are.
-
-    Returns list of dicts: {"id": str, "is_claim": bool, "suspicion": "high|medium|low", "reason": str}
-    """
-    # Trim text to keep prompt small.
-    trimmed = [{"id": b["id"], "text": (b["text"][:400] + "..." if len(b["text"]) > 400 else b["text"])} for b in blocks]
-    prompt = (
-        "You have a limited budget. For each text block, decide if it contains a factual claim that might be mis/disinformation. "
-        "For claims, assign a suspicion level: high, medium, or low. Skip non-claims. "
-        "Respond ONLY as a JSON array of objects: [{\"id\": \"...\", \"is_claim\": true/false, \"suspicion\": \"high|medium|low\", \"reason\": \"...\"}]. "
-        "Blocks:\n"
-    )
-    for b in trimmed:
-        prompt += f"- id: {b['id']}\n  text: {b['text']}\n"
-
-    response = call_gemini(prompt)
-
-    def _parse(text: str) -> List[Dict]:
-        try:
-            data = json.loads(text)
-            if isinstance(data, list):
-                return data
-        except Exception:
-            pass
-        # Fallback: try to find the first JSON array.
-        start = text.find("[")
-        end = text.rfind("]")
-        if start != -1 and end != -1 and end > start:
-            try:
-                data = json.loads(text[start : end + 1])
-                if isinstance(data, list):
-                    return data
-            except Exception:
-                return []
-        return []
-
-    parsed = _parse(response or "")
-    output = []
-    for item in parsed:
-        if not isinstance(item, dict) or "id" not in item:
-            continue
-        output.append(
-            {
-                "id": item.get("id"),
-                "is_claim": bool(item.get("is_claim", False)),
-                "suspicion": (item.get("suspicion") or "low").lower(),
-                "reason": item.get("reason", ""),
-            }
-        )
-    return output
+@app.get("/metrics/batching")
+def batching_metrics():
+    """Batch-size and wait-time histograms for the /investigate micro-batchers."""
+    if not (extract_batcher and classify_batcher):
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "extract": extract_batcher.metrics(),
+        "classify": classify_batcher.metrics(),
+    }
 
 
 @app.post("/scan")
 def scan(payload: ScanRequest):
     """Process multiple blocks; skip non-claims and respect a Gemini call budget."""
     flags = []
-    limit = payload.blocks[:20]  # safety limit
-    # First call: pre-screen to pick which blocks merit investigation.
-    pre_screen_data = pre_screen_blocks([b.model_dump() for b in limit])
+    limit = payload.blocks[:SCAN_MAX_BLOCKS]  # safety limit
+    # Pre-screen in token-bounded shards (one call each, run concurrently) to rank
+    # which blocks merit investigation. Blocks past PRESCREEN_MAX_SHARDS are dropped.
+    shards = shard_blocks([b.model_dump() for b in limit])
+    pre_screen_calls = len(shards)
+    limit = limit[: sum(len(shard) for shard in shards)]
+    pre_screen_data = screen_shards(shards)
     pre_screen_map = {item["id"]: item for item in pre_screen_data}
+    pre_screen_rank = {item["id"]: i for i, item in enumerate(pre_screen_data)}
 
-    remaining_budget = max(GEMINI_BUDGET - 1, 0)
-    max_investigations = remaining_budget // CALLS_PER_INVESTIGATION if CALLS_PER_INVESTIGATION else 0
+    max_investigations = GEMINI_BUDGET // CALLS_PER_INVESTIGATION if CALLS_PER_INVESTIGATION else 0
     min_calls_target = 8
     min_investigations = 0
     if GEMINI_BUDGET >= min_calls_target and CALLS_PER_INVESTIGATION:
-        min_investigations = math.ceil((min_calls_target - 1) / CALLS_PER_INVESTIGATION)
+        min_investigations = math.ceil(min_calls_target / CALLS_PER_INVESTIGATION)
 
-    suspicion_order = {"high": 0, "medium": 1, "low": 2}
     claim_candidates = []
 
     # Build a short page context string: url, title, and a few snippets.
@@ -186,8 +178,8 @@ def scan(payload: ScanRequest):
             }
         )
 
-    # Prioritize candidates based on suspicion level.
-    claim_candidates.sort(key=lambda c: suspicion_order.get(c["suspicion"], 3))
+    # Prioritize candidates using the merged suspicion ranking from pre-screening.
+    claim_candidates.sort(key=lambda c: pre_screen_rank.get(c["block"].id, len(pre_screen_rank)))
     target_count = max_investigations
     if max_investigations < min_investigations:
         target_count = max_investigations  # budget too low
@@ -241,8 +233,11 @@ def scan(payload: ScanRequest):
         "count": len(flags),
         "budget": {
             "total_calls": GEMINI_BUDGET,
-            "used_calls": 1 + CALLS_PER_INVESTIGATION * len(to_investigate),
+            "used_calls": CALLS_PER_INVESTIGATION * len(to_investigate),
+            "pre_screen_calls": pre_screen_calls,
             "investigated": len(to_investigate),
             "skipped_due_to_budget": len(skipped_due_to_budget),
+            "blocks_screened": len(limit),
+            "blocks_over_limit": max(len(payload.blocks) - len(limit), 0),
         },
     }
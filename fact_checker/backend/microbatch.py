@@ -0,0 +1,209 @@
+"""Collect concurrent single-item calls into small batches with an adaptive wait window."""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Single-item retries one batch may have in flight for items the batched answer
+# missed, so a bad batch cannot fire N calls at once or take over the shared pool.
+MAX_CONCURRENT_FALLBACKS = 4
+
+_fallback_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="batch-fallback")
+
+
+class Histogram:
+    """Non-cumulative bucket counter: each observation lands in the first bucket it fits."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = next((i for i, edge in enumerate(self.buckets) if value <= edge), len(self.buckets))
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._total += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={edge:g}" for edge in self.buckets] + [f">{self.buckets[-1]:g}"]
+            return {
+                "buckets": dict(zip(labels, self._counts)),
+                "count": self._total,
+                "mean": self._sum / self._total if self._total else 0.0,
+            }
+
+
+def fill_missing(
+    items: List[Any],
+    answered: Dict[int, Any],
+    single_fn: Callable[[Any], Any],
+    failure_fn: Callable[[Any], Any],
+    max_concurrent: int = MAX_CONCURRENT_FALLBACKS,
+) -> List[Any]:
+    """
+    Complete a batch result: every index missing from ``answered`` is retried with
+    ``single_fn``, at most ``max_concurrent`` at a time. ``failure_fn`` is used only
+    for items whose retry raises.
+    """
+    results = dict(answered)
+    missing = (i for i in range(len(items)) if i not in answered)
+    in_flight: Dict[Future, int] = {}
+
+    def launch() -> None:
+        for i in islice(missing, max(max_concurrent, 1) - len(in_flight)):
+            in_flight[_fallback_pool.submit(single_fn, items[i])] = i
+
+    launch()
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = in_flight.pop(future)
+            try:
+                results[i] = future.result()
+            except Exception as exc:
+                logging.exception("Single-item fallback failed: %s", exc)
+                results[i] = failure_fn(items[i])
+        launch()
+    return [results[i] for i in range(len(items))]
+
+
+class MicroBatcher:
+    """
+    Group items submitted from many threads and run them through ``batch_fn`` together.
+
+    ``batch_fn`` takes a list of items and must return one result per item, in order.
+    A batch is dispatched once ``max_items`` are waiting or the wait window closes.
+    The window is roughly the time needed to fill a batch at the observed arrival
+    rate, clamped to ``[min_wait, max_wait]``: it is longest at moderate load and
+    shrinks as the rate rises, since batches then fill quickly anyway. When another
+    item is unlikely within ``max_wait`` it drops to ``min_wait`` so lone requests
+    are not delayed.
+
+    ``lookup`` (optional) answers an item without batching, e.g. from a cache; items
+    whose ``key_fn`` matches within one batch are sent once and share the result.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_items: int = 8,
+        min_wait: float = 0.005,
+        max_wait: float = 0.05,
+        dispatch_workers: int = 4,
+        lookup: Optional[Callable[[Any], Optional[Any]]] = None,
+        key_fn: Callable[[Any], Any] = repr,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.lookup = lookup
+        self.key_fn = key_fn
+        self.lookup_hits = 0
+        self.deduplicated = 0
+        self.max_items = max(max_items, 1)
+        self.min_wait = min_wait
+        self.max_wait = max(max_wait, min_wait)
+        self.window = min_wait
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32])
+        self.wait_ms = Histogram([1, 5, 10, 25, 50, 100, 250])
+        self._pending: "queue.Queue[Tuple[Any, Future, float]]" = queue.Queue()
+        self._rate = 0.0  # EWMA of arrivals per second
+        self._last_arrival = 0.0
+        self._rate_lock = threading.Lock()
+        self._dispatcher = ThreadPoolExecutor(max_workers=dispatch_workers, thread_name_prefix=f"{name}-batch")
+        self._collector = threading.Thread(target=self._run, name=f"{name}-collector", daemon=True)
+        self._collector.start()
+
+    def submit(self, item: Any) -> Any:
+        """Queue one item and block until its batch has been processed."""
+        if self.lookup is not None:
+            found = self.lookup(item)
+            if found is not None:
+                with self._rate_lock:
+                    self.lookup_hits += 1
+                return found
+        future: Future = Future()
+        now = time.perf_counter()
+        self._observe_arrival(now)
+        self._pending.put((item, future, now))
+        return future.result()
+
+    def _observe_arrival(self, now: float) -> None:
+        with self._rate_lock:
+            if self._last_arrival:
+                gap = max(now - self._last_arrival, 1e-4)
+                self._rate = 0.8 * self._rate + 0.2 * (1.0 / gap)
+            self._last_arrival = now
+
+    def _next_window(self) -> float:
+        with self._rate_lock:
+            rate = self._rate
+            idle = time.perf_counter() - self._last_arrival
+        # Traffic has gone quiet, or another item is unlikely within max_wait.
+        if idle > self.max_wait or rate * self.max_wait < 1:
+            return self.min_wait
+        return min(max((self.max_items - 1) / rate, self.min_wait), self.max_wait)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            self.window = self._next_window()
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_items:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatcher.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple[Any, Future, float]]) -> None:
+        started = time.perf_counter()
+        # Identical items in one window are sent once and share the result.
+        unique: Dict[Any, int] = {}
+        items: List[Any] = []
+        slots: List[int] = []
+        for item, _, _ in batch:
+            key = self.key_fn(item)
+            if key not in unique:
+                unique[key] = len(items)
+                items.append(item)
+            slots.append(unique[key])
+        with self._rate_lock:
+            self.deduplicated += len(batch) - len(items)
+        self.batch_sizes.observe(len(items))
+        for _, _, queued_at in batch:
+            self.wait_ms.observe((started - queued_at) * 1000)
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise ValueError(f"{self.name} batch returned {len(results)} results for {len(items)} items")
+        except Exception as exc:
+            logging.exception("Micro-batch %s failed: %s", self.name, exc)
+            for _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        for (_, future, _), slot in zip(batch, slots):
+            future.set_result(results[slot])
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window * 1000,
+            "arrival_rate_per_s": self._rate,
+            "max_items": self.max_items,
+            "lookup_hits": self.lookup_hits,
+            "deduplicated": self.deduplicated,
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+        }
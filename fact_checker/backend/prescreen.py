@@ -0,0 +1,146 @@
+"""Map-reduce pre-screening of page blocks: shard by token budget, screen shards concurrently, merge."""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    from .gemini_client import call_gemini
+except ImportError:  # Support running as a script without package context.
+    from gemini_client import call_gemini
+
+
+# Max blocks accepted per scan, per-block character cap, approximate prompt tokens
+# per shard (one Gemini call each), and max shards (calls) per scan.
+SCAN_MAX_BLOCKS = int(os.getenv("SCAN_MAX_BLOCKS", "200"))
+PRESCREEN_BLOCK_CHARS = int(os.getenv("PRESCREEN_BLOCK_CHARS", "400"))
+PRESCREEN_SHARD_TOKENS = int(os.getenv("PRESCREEN_SHARD_TOKENS", "4000"))
+PRESCREEN_MAX_SHARDS = int(os.getenv("PRESCREEN_MAX_SHARDS", "6"))
+PRESCREEN_CONCURRENCY = int(os.getenv("PRESCREEN_CONCURRENCY", "4"))
+
+# Rough heuristic for English text; good enough to bound prompt size.
+CHARS_PER_TOKEN = 4
+
+SUSPICION_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+PROMPT_HEADER = (
+    "You have a limited budget. For each text block, decide if it contains a factual claim that might be mis/disinformation. "
+    "For claims, assign a suspicion level: high, medium, or low. Skip non-claims. "
+    "Respond ONLY as a JSON array of objects: [{\"id\": \"...\", \"is_claim\": true/false, \"suspicion\": \"high|medium|low\", \"reason\": \"...\"}]. "
+    "Blocks:\n"
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _format_block(block: Dict, max_chars: int) -> str:
+    text = block["text"]
+    if len(text) > max_chars:
+        text = text[:max_chars] + "..."
+    return f"- id: {block['id']}\n  text: {text}\n"
+
+
+def _pack(costs: List[int], capacity: int) -> List[List[int]]:
+    """Greedily pack block indexes, in order, into groups whose summed cost stays within capacity."""
+    groups: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for index, cost in enumerate(costs):
+        if current and used + cost > capacity:
+            groups.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def shard_blocks(
+    blocks: List[Dict],
+    max_tokens: int = PRESCREEN_SHARD_TOKENS,
+    max_chars: int = PRESCREEN_BLOCK_CHARS,
+    max_shards: Optional[int] = PRESCREEN_MAX_SHARDS,
+) -> List[List[Dict]]:
+    """
+    Split blocks, in page order, into shards whose prompts stay under ``max_tokens``.
+
+    At most ``max_shards`` shards (Gemini calls) are returned; blocks that do not
+    fit are left out, so the shards always cover a page-order prefix of ``blocks``.
+    """
+    costs = [_estimate_tokens(_format_block(block, max_chars)) for block in blocks]
+    groups = _pack(costs, max(max_tokens - _estimate_tokens(PROMPT_HEADER), 1))
+    if max_shards is not None:
+        groups = groups[: max(max_shards, 1)]
+    return [[blocks[i] for i in group] for group in groups]
+
+
+def _parse(text: str) -> List[Dict]:
+    try:
+        data = json.loads(text)
+        if isinstance(data, list):
+            return data
+    except Exception:
+        pass
+    # Fallback: try to find the first JSON array.
+    start = text.find("[")
+    end = text.rfind("]")
+    if start != -1 and end != -1 and end > start:
+        try:
+            data = json.loads(text[start : end + 1])
+            if isinstance(data, list):
+                return data
+        except Exception:
+            return []
+    return []
+
+
+def _screen_shard(shard: List[Dict], max_chars: int = PRESCREEN_BLOCK_CHARS) -> List[Dict]:
+    """Screen one shard with a single Gemini call; ignores ids not in the shard."""
+    prompt = PROMPT_HEADER + "".join(_format_block(b, max_chars) for b in shard)
+    response = call_gemini(prompt)
+
+    known_ids = {str(b["id"]) for b in shard}
+    output = []
+    for item in _parse(response or ""):
+        if not isinstance(item, dict) or str(item.get("id")) not in known_ids:
+            continue
+        output.append(
+            {
+                "id": str(item.get("id")),
+                "is_claim": bool(item.get("is_claim", False)),
+                "suspicion": (item.get("suspicion") or "low").lower(),
+                "reason": item.get("reason", ""),
+            }
+        )
+    return output
+
+
+def screen_shards(shards: List[List[Dict]], concurrency: int = PRESCREEN_CONCURRENCY) -> List[Dict]:
+    """
+    Screen shards concurrently and merge into one suspicion-ranked list.
+
+    Claims come first, ordered high → medium → low suspicion, then by page order.
+    Duplicate ids keep the first (page-order) result.
+    """
+    if not shards:
+        return []
+    with ThreadPoolExecutor(max_workers=max(min(concurrency, len(shards)), 1)) as pool:
+        shard_results = list(pool.map(_screen_shard, shards))
+
+    position = {str(b["id"]): i for i, b in enumerate(b for shard in shards for b in shard)}
+    merged: Dict[str, Dict] = {}
+    for results in shard_results:
+        for item in results:
+            merged.setdefault(item["id"], item)
+    return sorted(
+        merged.values(),
+        key=lambda item: (
+            not item["is_claim"],
+            SUSPICION_ORDER.get(item["suspicion"], 3),
+            position.get(item["id"], len(position)),
+        ),
+    )
@@ -0,0 +1,240 @@
+"""Content-addressed Gemini response cache (on-disk LRU with TTL) and record/replay corpus."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+# off: no caching | cache: serve repeats from disk | record: cache + append to corpus |
+# replay: serve only from the recorded corpus, never touch the network.
+GEMINI_CACHE_MODE = os.getenv("GEMINI_CACHE_MODE", "cache").lower()
+GEMINI_CACHE_PATH = os.getenv("GEMINI_CACHE_PATH", ".gemini_cache.db")
+GEMINI_CACHE_MAX_BYTES = int(os.getenv("GEMINI_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", str(24 * 60 * 60)))
+GEMINI_RECORD_PATH = os.getenv("GEMINI_RECORD_PATH", "gemini_recordings.jsonl")
+
+
+def cache_key(model: str, prompt: str) -> str:
+    """Hash model name and prompt into a stable cache key."""
+    return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response store bounded by total bytes, evicting least recently used entries.
+
+    LRU order, sizes and the byte total are kept in memory, so a hit is one indexed read
+    on a per-thread connection. Access times are written back in batches, not per hit.
+    """
+
+    # Flush pending last_access updates after this many hits or seconds.
+    TOUCH_FLUSH_COUNT = 64
+    TOUCH_FLUSH_SECONDS = 5.0
+
+    def __init__(self, path: str = GEMINI_CACHE_PATH, max_bytes: int = GEMINI_CACHE_MAX_BYTES, ttl: float = GEMINI_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._conn = sqlite3.connect(path, check_same_thread=False)  # writer, used under _lock
+        # WAL lets per-thread readers run while the writer commits.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_access REAL NOT NULL, derived INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "derived" not in columns:  # cache file from before derived entries were tagged
+            self._conn.execute("ALTER TABLE responses ADD COLUMN derived INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+        self._conn.commit()
+
+        # key -> (size, created, derived), least recently used first.
+        self._index: "OrderedDict[str, Tuple[int, float, bool]]" = OrderedDict()
+        for key, size, created, derived in self._conn.execute(
+            "SELECT key, size, created, derived FROM responses ORDER BY last_access ASC"
+        ):
+            self._index[key] = (size, created, bool(derived))
+        self._bytes = sum(size for size, _, _ in self._index.values())
+        self._touched: Dict[str, float] = {}
+        self._expired: Set[str] = set()  # keys pending DELETE on the next flush
+        self._last_flush = time.monotonic()
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, bool]]:
+        """Return ``(response, derived)`` for a key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                self._drop(key)
+                self._expired.add(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self._touched[key] = now
+            if (
+                len(self._touched) >= self.TOUCH_FLUSH_COUNT
+                or time.monotonic() - self._last_flush > self.TOUCH_FLUSH_SECONDS
+            ):
+                self._flush()
+
+        row = self._reader().execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:  # evicted between the index check and the read
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0], entry[2]
+
+    def put(self, key: str, response: str, derived: bool = False) -> None:
+        """Store a response; ``derived`` marks one synthesized locally rather than returned by Gemini."""
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._drop(key)
+            self._index[key] = (size, now, derived)
+            self._bytes += size
+            self._expired.discard(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, last_access, derived) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response, size, now, now, int(derived)),
+            )
+            while self._bytes > self.max_bytes:
+                stale = next(iter(self._index))
+                self._drop(stale)
+                self._expired.add(stale)
+            self._flush()
+
+    def _drop(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+        self._touched.pop(key, None)
+
+    def _flush(self) -> None:
+        """Write batched access times and deletions in one transaction (caller holds _lock)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+        if self._expired:
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in self._expired])
+        self._conn.commit()
+        self._touched.clear()
+        self._expired.clear()
+        self._last_flush = time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._index.clear()
+            self._touched.clear()
+            self._expired.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._index), "bytes": self._bytes}
+
+
+class RecordedCorpus:
+    """
+    JSONL corpus of recorded responses, one {"key", "model", "prompt", "response"} per line.
+
+    Entries synthesized locally (e.g. one item split out of a batched answer) carry
+    ``"derived": true``. A real Gemini response for a key always wins over a derived one.
+    """
+
+    def __init__(self, path: str = GEMINI_RECORD_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._responses: Dict[str, str] = {}
+        self._derived: Set[str] = set()
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                    self._load(entry["key"], entry["response"], bool(entry.get("derived", False)))
+                except Exception:
+                    logging.warning("Skipping malformed recording line in %s", self.path)
+
+    def _load(self, key: str, response: str, derived: bool) -> bool:
+        """Index one entry; returns False if it is redundant or would shadow a real response."""
+        known = key in self._responses
+        if derived and known and key not in self._derived:
+            return False
+        if known and self._responses[key] == response and (key in self._derived) == derived:
+            return False
+        self._responses[key] = response
+        if derived:
+            self._derived.add(key)
+        else:
+            self._derived.discard(key)
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        return self._responses.get(key)
+
+    def record(self, key: str, model: str, prompt: str, response: str, derived: bool = False) -> None:
+        with self._lock:
+            if not self._load(key, response, derived):
+                return
+            entry = {"key": key, "model": model, "prompt": prompt, "response": response}
+            if derived:
+                entry["derived"] = True
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry) + "\n")
+
+
+_cache: Optional[ResponseCache] = None
+_corpus: Optional[RecordedCorpus] = None
+_init_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is off or replaying."""
+    global _cache
+    if GEMINI_CACHE_MODE not in {"cache", "record"}:
+        return None
+    with _init_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def get_corpus() -> Optional[RecordedCorpus]:
+    """Return the record/replay corpus, or None outside record and replay modes."""
+    global _corpus
+    if GEMINI_CACHE_MODE not in {"record", "replay"}:
+        return None
+    with _init_lock:
+        if _corpus is None:
+            _corpus = RecordedCorpus()
+        return _corpus
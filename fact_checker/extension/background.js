@@ -103,7 +103,7 @@ async function startScan() {
 
   let response;
   try {
-    response = await sendScanPayload({ url: url || tab.url, title: title || tab.title, blocks: blocks.slice(0, 20) });
+    response = await sendScanPayload({ url: url || tab.url, title: title || tab.title, blocks });
   } catch (err) {
     const summary = { total: blocks.length, red: 0, amber: 0, blue: 0, green: 0, ts: Date.now(), error: String(err) };
     await chrome.storage.local.set({ scanSummary: summary });
@@ -51,7 +51,7 @@ function renderScanSummary(summary) {
       <span class="badge blue">${summary.blue || 0} not checked</span>
       <span class="badge green">${summary.green || 0} ok</span>
     </p>
-    ${summary.budget ? `<p class="budget">Budget: used ${summary.budget.used_calls}/${summary.budget.total_calls} Gemini calls; investigated ${summary.budget.investigated}, skipped ${summary.budget.skipped_due_to_budget} due to budget.</p>` : ""}
+    ${summary.budget ? `<p class="budget">Budget: used ${summary.budget.used_calls}/${summary.budget.total_calls} Gemini calls (+${summary.budget.pre_screen_calls ?? 0} pre-screen); investigated ${summary.budget.investigated}, skipped ${summary.budget.skipped_due_to_budget} due to budget.</p>` : ""}
     </p>
   `;
 }
@@ -0,0 +1,83 @@
+"""Headless ASGI service around the guardrail → query → decoy flow."""
+
+import asyncio
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import List, Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from pydantic import BaseModel
+
+from audit import AuditLog
+from service import HoneypotService
+
+
+# Worker threads for the blocking guardrail and SQLite calls; the DB pool is
+# sized to match so a worker never waits on a connection.
+WORKERS = int(os.getenv("HONEYPOT_WORKERS", "8"))
+MAX_BATCH = int(os.getenv("HONEYPOT_MAX_BATCH", "100"))
+# /audit is only served when this is set, and only to requests presenting it in
+# X-Admin-Token; attackers probing the honeypot must not see why they were blocked.
+ADMIN_TOKEN = os.getenv("HONEYPOT_ADMIN_TOKEN", "")
+
+
+class EvaluateRequest(BaseModel):
+    input: str
+
+
+class BatchRequest(BaseModel):
+    inputs: List[str]
+
+
+app = FastAPI(title="Honeypot Guardrail", version="0.1.0")
+service = HoneypotService(pool_size=WORKERS, audit=AuditLog())
+executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="honeypot")
+
+
+async def _handle(user_input: str) -> dict:
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(executor, service.handle, user_input)
+    return result.to_dict()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    executor.shutdown(wait=True)
+    service.close()
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "workers": WORKERS, "max_batch": MAX_BATCH}
+
+
+@app.post("/evaluate")
+async def evaluate(payload: EvaluateRequest):
+    return await _handle(payload.input)
+
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(payload: BatchRequest):
+    """Evaluate many inputs concurrently; results are returned in request order."""
+    if len(payload.inputs) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH} inputs.")
+    results = await asyncio.gather(*(_handle(text) for text in payload.inputs))
+    return {"results": results, "count": len(results)}
+
+
+@app.get("/audit", include_in_schema=False)
+def audit_events(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    decision: Optional[str] = None,
+    limit: int = 100,
+    x_admin_token: str = Header(default=""),
+):
+    """Query logged attempts by unix-time range and decision ("safe" or "blocked")."""
+    # Answer 404 rather than 401/403 so the endpoint's existence is not revealed.
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+    events = service.audit.query(start=start, end=end, decision=decision, limit=max(1, min(limit, 1000)))
+    return {"events": [asdict(e) for e in events], "stats": service.audit.stats()}
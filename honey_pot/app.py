@@ -1,7 +1,11 @@
+import time
+
 import streamlit as st
 
-from data_backend import DB_PATH, init_db, run_insecure_query
-from guardrail import evaluate_input
+from data_backend import DB_PATH
+from guardrail import normalize_input
+from audit import AuditLog
+from service import HoneypotResult, HoneypotService
 
 
 st.set_page_config(page_title="LLM Guardrail Demo", page_icon="🛡️")
@@ -13,16 +17,43 @@ st.write(
     "If the guardrail thinks the input is malicious, it returns fake data instead of the real database."
 )
 
-# Ensure the demo database exists.
-init_db()
+# How long cached guardrail → query results stay valid (seconds).
+CACHE_TTL = 600
+
+
+@st.cache_resource
+def get_service() -> HoneypotService:
+    # Seeds the demo database and opens the DB pool and guardrail model once per process.
+    return HoneypotService(DB_PATH, audit=AuditLog())
+
+
+class _Uncacheable(Exception):
+    """Raised out of a cached function so Streamlit returns the value without storing it."""
+
+    def __init__(self, value):
+        super().__init__("uncacheable result")
+        self.value = value
+
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_handle(normalized_input: str) -> HoneypotResult:
+    # Normalization is this UI's cache key only; the service handles input as given.
+    # Attempts are audited by the caller so cache hits are recorded too.
+    result = get_service().handle(normalized_input, record=False)
+    if result.decision.failed:
+        # A transient Gemini error must not keep a benign input blocked for CACHE_TTL.
+        raise _Uncacheable(result)
+    return result
 
-def fake_rows():
-    # Decoy data to return when the guardrail blocks the request.
-    return [
-        (0, "REDACTED", "redacted@example.com", "Unknown", 0),
-        (0, "Honeypot User", "honeypot@example.com", "Unknown", 0),
-    ]
+
+def cached_handle(normalized_input: str) -> HoneypotResult:
+    try:
+        return _cached_handle(normalized_input)
+    except _Uncacheable as exc:
+        return exc.value
+
+
+get_service()
 
 
 st.subheader("Try a query")
@@ -39,8 +70,20 @@ with st.form("query_form"):
     )
     submitted = st.form_submit_button("Send to backend")
 
+if st.sidebar.button("Clear cached results"):
+    _cached_handle.clear()
+    st.sidebar.success("Cached guardrail and query results cleared.")
+
 if submitted:
-    decision = evaluate_input(user_input)
+    normalized = normalize_input(user_input)
+    started = time.perf_counter()
+    result = cached_handle(normalized)
+    request_ms = (time.perf_counter() - started) * 1000
+    decision = result.decision
+    # Record before rendering so a display error never loses an attempt; cache hits
+    # are still attempts worth auditing, so this lives outside the cached call. Log the
+    # raw input: whitespace tricks are exactly what threat analysis needs to see.
+    get_service().record_attempt(user_input, decision, request_ms)
     production_mode = mode.startswith("Production")
 
     if not production_mode:
@@ -51,40 +94,38 @@ if submitted:
             "Production mode hides guardrail reasoning. Blocked requests receive decoy data."
         )
 
-    if decision.safe:
-        rows = run_insecure_query(user_input)
+    column_config = {
+        0: st.column_config.TextColumn("id"),
+        1: st.column_config.TextColumn("name"),
+        2: st.column_config.TextColumn("email"),
+        3: st.column_config.TextColumn("department"),
+        4: st.column_config.NumberColumn("salary"),
+    }
+    if result.decoy:
+        if production_mode:
+            st.info("Showing generic data.")
+        else:
+            st.warning("Input blocked → returning fake data instead of hitting the DB.")
+        st.dataframe(result.rows, column_config=column_config, hide_index=True)
+    elif result.error:
+        if production_mode:
+            st.info("Query returned no rows.")
+        else:
+            st.error(f"Input marked SAFE but the database rejected it. {result.error}")
+    else:
         st.success(
             "Showing real data."
             if production_mode
             else f"Input marked SAFE → real database queried at {DB_PATH}."
         )
-        if rows:
-            st.dataframe(
-                rows,
-                column_config={
-                    0: st.column_config.TextColumn("id"),
-                    1: st.column_config.TextColumn("name"),
-                    2: st.column_config.TextColumn("email"),
-                    3: st.column_config.TextColumn("department"),
-                    4: st.column_config.NumberColumn("salary"),
-                },
-                hide_index=True,
-            )
+        if result.rows:
+            st.dataframe(result.rows, column_config=column_config, hide_index=True)
         else:
             st.info("Query returned no rows.")
-    else:
-        if production_mode:
-            st.info("Showing generic data.")
-        else:
-            st.warning("Input blocked → returning fake data instead of hitting the DB.")
-        st.dataframe(
-            fake_rows(),
-            column_config={
-                0: st.column_config.TextColumn("id"),
-                1: st.column_config.TextColumn("name"),
-                2: st.column_config.TextColumn("email"),
-                3: st.column_config.TextColumn("department"),
-                4: st.column_config.NumberColumn("salary"),
-            },
-            hide_index=True,
-        )
\ No newline at end of file
+
+    if not production_mode:
+        timings = result.timings
+        st.caption(
+            f"Timings: guardrail {timings['guardrail_ms']:.1f} ms · query {timings['query_ms']:.1f} ms · "
+            f"total {timings['total_ms']:.1f} ms · this request {request_ms:.1f} ms"
+        )
@@ -0,0 +1,165 @@
+"""Non-blocking audit log of every guardrail attempt, written to SQLite in batches."""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+AUDIT_DB_PATH = Path("audit.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    input TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    source TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    duration_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_events (ts);
+CREATE INDEX IF NOT EXISTS idx_audit_decision_ts ON audit_events (decision, ts);
+"""
+
+
+@dataclass
+class AuditEvent:
+    input: str
+    decision: str  # "safe" or "blocked"
+    source: str  # guardrail source: "heuristic" or "gemini"
+    reason: str
+    duration_ms: float
+    ts: float = field(default_factory=time.time)
+
+
+class AuditLog:
+    """
+    Queue audit events in memory and persist them from a background writer thread.
+
+    ``record`` never blocks: when the bounded queue is full the event is dropped and
+    counted instead. The writer inserts each batch in a single transaction.
+    """
+
+    def __init__(
+        self,
+        path: Path = AUDIT_DB_PATH,
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[AuditEvent]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._written = 0
+
+        conn = sqlite3.connect(path)
+        # WAL lets readers query the log while the writer is committing.
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, event: AuditEvent) -> bool:
+        """Enqueue an event; returns False (and counts a drop) if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def _next_batch(self) -> List[AuditEvent]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.path)
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO audit_events (ts, input, decision, source, reason, duration_ms) "
+                            "VALUES (?, ?, ?, ?, ?, ?);",
+                            [(e.ts, e.input, e.decision, e.source, e.reason, e.duration_ms) for e in batch],
+                        )
+                    with self._lock:
+                        self._written += len(batch)
+                except sqlite3.Error as exc:
+                    logging.exception("Audit batch of %d events failed: %s", len(batch), exc)
+                    with self._lock:
+                        self._dropped += len(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            conn.close()
+
+    def flush(self) -> None:
+        """Block until every queued event has been written (or dropped on error)."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._writer.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+            }
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        decision: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[AuditEvent]:
+        """Return the newest events with ``start <= ts < end`` and an optional decision filter."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        if decision is not None:
+            clauses.append("decision = ?")
+            params.append(decision)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT input, decision, source, reason, duration_ms, ts FROM audit_events "
+            f"{where} ORDER BY ts DESC LIMIT ?;"
+        )
+        conn = sqlite3.connect(self.path)
+        try:
+            # SQLite treats a negative LIMIT as unlimited.
+            rows = conn.execute(sql, (*params, max(limit, 1))).fetchall()
+        finally:
+            conn.close()
+        return [AuditEvent(*row) for row in rows]
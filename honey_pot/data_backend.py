@@ -1,6 +1,8 @@
+import queue
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 DB_PATH = Path("private.db")
 
@@ -43,15 +45,39 @@ def init_db(path: Path = DB_PATH) -> None:
     conn.close()
 
 
-def run_insecure_query(user_input: str, path: Path = DB_PATH) -> Iterable[Tuple]:
+class ConnectionPool:
+    """Small fixed-size pool of SQLite connections shared across threads."""
+
+    def __init__(self, path: Path = DB_PATH, size: int = 4) -> None:
+        self.path = path
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            # Streamlit reruns (and worker threads) may hand a connection to a
+            # different thread than the one that opened it.
+            self._idle.put(sqlite3.connect(path, check_same_thread=False))
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+def run_insecure_query(
+    user_input: str, path: Path = DB_PATH, pool: Optional[ConnectionPool] = None
+) -> Iterable[Tuple]:
     """
     Deliberately insecure query that interpolates user input directly into SQL.
 
     This mirrors a vulnerable backend. Do not use this pattern in real systems.
+    If a pool is given, a pooled connection is used instead of opening a new one.
     """
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-
     sql = f"""
     SELECT id, name, email, department, salary
     FROM employees
@@ -59,6 +85,17 @@ def run_insecure_query(user_input: str, path: Path = DB_PATH) -> Iterable[Tuple]
         OR department LIKE '%{user_input}%';
     """
 
+    if pool is not None:
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql)
+                return cur.fetchall()
+            finally:
+                cur.close()
+
+    conn = sqlite3.connect(path)
+    cur = conn.cursor()
     cur.execute(sql)
     rows = cur.fetchall()
     conn.close()
@@ -1,7 +1,7 @@
 import os
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 from dotenv import load_dotenv
 
@@ -32,6 +32,7 @@ class GuardrailDecision:
     safe: bool
     reason: str
     source: str  # "heuristic" or "gemini"
+    failed: bool = False  # True when the guardrail errored; do not cache these
 
 
 def _heuristic_guard(user_input: str) -> GuardrailDecision:
@@ -47,14 +48,26 @@ def _heuristic_guard(user_input: str) -> GuardrailDecision:
     )
 
 
-def _gemini_guard(user_input: str) -> Optional[GuardrailDecision]:
+def normalize_input(user_input: str) -> str:
+    """Strip and collapse whitespace so equivalent inputs share cache entries."""
+    return " ".join(user_input.split())
+
+
+def build_gemini_model() -> Optional[Any]:
+    """Configure and return the Gemini model, or None if it is unavailable."""
     api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_GENAI_API_KEY")
     if not api_key or genai is None:
         return None
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel("gemini-2.5-flash")
 
+
+def _gemini_guard(user_input: str, model: Optional[Any] = None) -> Optional[GuardrailDecision]:
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.5-flash")
+        if model is None:
+            model = build_gemini_model()
+        if model is None:
+            return None
         prompt = (
             "You are a security filter. Given a user input that will be placed directly into an "
             "SQL query, classify it strictly as SAFE or UNSAFE. If UNSAFE, briefly say why. "
@@ -75,18 +88,24 @@ def _gemini_guard(user_input: str) -> Optional[GuardrailDecision]:
             safe=False,
             reason=f"Gemini call failed: {exc}. Falling back to heuristic.",
             source="gemini",
+            failed=True,
         )
     return None
 
 
-def evaluate_input(user_input: str) -> GuardrailDecision:
-    """Try Gemini if available, otherwise use a regex heuristic."""
+def evaluate_input(user_input: str, model: Optional[Any] = None) -> GuardrailDecision:
+    """
+    Try Gemini if available, otherwise use a regex heuristic.
+
+    Pass a pre-built ``model`` (see ``build_gemini_model``) to avoid reconfiguring
+    the Gemini client on every call.
+    """
     if user_input.strip() == "":
         return GuardrailDecision(
             safe=False, reason="Empty input is not allowed.", source="heuristic"
         )
 
-    gemini_decision = _gemini_guard(user_input)
+    gemini_decision = _gemini_guard(user_input, model)
     if gemini_decision:
         return gemini_decision
     return _heuristic_guard(user_input)
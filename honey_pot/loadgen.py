@@ -0,0 +1,141 @@
+"""
+Replay benign and attack corpora against the honeypot API and report throughput/latency.
+
+    python loadgen.py --url http://localhost:8001 --requests 500 --concurrency 16
+    python loadgen.py --batch-size 20 --attack-corpus attacks.txt
+
+Corpus files contain one input per line; built-in samples are used otherwise.
+"""
+
+import argparse
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BENIGN_CORPUS = [
+    "Alice",
+    "Bob Smith",
+    "Engineering",
+    "Finance",
+    "Data Science",
+    "Emily",
+    "Product",
+    "Security",
+]
+
+ATTACK_CORPUS = [
+    "Alice'; DROP TABLE employees;--",
+    "' OR 1=1 --",
+    "x' UNION SELECT name, email FROM employees --",
+    "'; DELETE FROM employees; --",
+    "Bob' /* comment */",
+    "'; UPDATE employees SET salary = 0; --",
+]
+
+
+def _load_corpus(path: Optional[str], default: List[str]) -> List[str]:
+    if not path:
+        return default
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line for line in lines if line.strip()]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _send(session: requests.Session, url: str, kind: str, inputs: List[str]) -> Tuple[str, float, int, bool]:
+    """Send one single or batch request; returns (kind, latency_s, items, ok)."""
+    started = time.perf_counter()
+    try:
+        if len(inputs) == 1:
+            resp = session.post(f"{url}/evaluate", json={"input": inputs[0]}, timeout=30)
+        else:
+            resp = session.post(f"{url}/evaluate/batch", json={"inputs": inputs}, timeout=60)
+        ok = resp.status_code == 200
+    except requests.RequestException:
+        ok = False
+    return kind, time.perf_counter() - started, len(inputs), ok
+
+
+def run(url: str, benign: List[str], attacks: List[str], total: int, concurrency: int, batch_size: int) -> Dict:
+    # Interleave the corpora so both kinds of traffic hit the service concurrently.
+    mixed = itertools.cycle(
+        [("benign", text) for text in benign] + [("attack", text) for text in attacks]
+    )
+    work: List[Tuple[str, List[str]]] = []
+    for _ in range(max(total // batch_size, 1)):
+        chunk = [next(mixed) for _ in range(batch_size)]
+        kind = chunk[0][0] if len({k for k, _ in chunk}) == 1 else "mixed"
+        work.append((kind, [text for _, text in chunk]))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda w: _send(session, url, w[0], w[1]), work))
+    elapsed = time.perf_counter() - started
+
+    report: Dict = {"elapsed_s": elapsed, "by_kind": {}}
+    for kind in sorted({o[0] for o in outcomes}) + ["all"]:
+        selected = [o for o in outcomes if kind == "all" or o[0] == kind]
+        latencies = sorted(o[1] * 1000 for o in selected)
+        items = sum(o[2] for o in selected)
+        report["by_kind"][kind] = {
+            "requests": len(selected),
+            "items": items,
+            "errors": sum(1 for o in selected if not o[3]),
+            "throughput_items_s": items / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 50),
+            "p90_ms": _percentile(latencies, 90),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": latencies[-1] if latencies else 0.0,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8001", help="Base URL of the honeypot API.")
+    parser.add_argument("--requests", type=int, default=200, help="Total inputs to send.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Inputs per request (>1 uses /evaluate/batch).")
+    parser.add_argument("--benign-corpus", help="File with one benign input per line.")
+    parser.add_argument("--attack-corpus", help="File with one attack input per line.")
+    args = parser.parse_args()
+
+    report = run(
+        args.url.rstrip("/"),
+        _load_corpus(args.benign_corpus, BENIGN_CORPUS),
+        _load_corpus(args.attack_corpus, ATTACK_CORPUS),
+        total=args.requests,
+        concurrency=args.concurrency,
+        batch_size=max(args.batch_size, 1),
+    )
+
+    print(f"Elapsed: {report['elapsed_s']:.2f}s")
+    print(f"{'kind':<8} {'reqs':>6} {'items':>6} {'errs':>5} {'items/s':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for kind, stats in report["by_kind"].items():
+        print(
+            f"{kind:<8} {stats['requests']:>6} {stats['items']:>6} {stats['errors']:>5} "
+            f"{stats['throughput_items_s']:>9.1f} {stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms "
+            f"{stats['p99_ms']:>7.1f}ms {stats['max_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from audit import AuditEvent, AuditLog
+from data_backend import DB_PATH, ConnectionPool, init_db, run_insecure_query
+from guardrail import GuardrailDecision, build_gemini_model, evaluate_input
+
+
+def decoy_rows() -> List[Tuple]:
+    # Decoy data to return when the guardrail blocks the request.
+    return [
+        (0, "REDACTED", "redacted@example.com", "Unknown", 0),
+        (0, "Honeypot User", "honeypot@example.com", "Unknown", 0),
+    ]
+
+
+@dataclass
+class HoneypotResult:
+    input: str
+    decision: GuardrailDecision
+    rows: List[Tuple]
+    decoy: bool
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # milliseconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["rows"] = [list(row) for row in self.rows]
+        return data
+
+
+class HoneypotService:
+    """
+    Guardrail → query → decoy flow shared by the Streamlit app and the API.
+
+    The SQLite pool and Gemini model are created once and reused for every call.
+    If an audit log is given, every attempt handled or recorded is queued to it.
+    """
+
+    def __init__(
+        self, db_path: Path = DB_PATH, pool_size: int = 4, audit: Optional[AuditLog] = None
+    ) -> None:
+        init_db(db_path)
+        self.pool = ConnectionPool(db_path, size=pool_size)
+        self.model = build_gemini_model()
+        self.audit = audit
+
+    def record_attempt(self, user_input: str, decision: GuardrailDecision, duration_ms: float) -> None:
+        if self.audit is None:
+            return
+        self.audit.record(
+            AuditEvent(
+                input=user_input,
+                decision="safe" if decision.safe else "blocked",
+                source=decision.source,
+                reason=decision.reason,
+                duration_ms=duration_ms,
+            )
+        )
+
+    def evaluate(self, user_input: str) -> GuardrailDecision:
+        return evaluate_input(user_input, model=self.model)
+
+    def query(self, user_input: str) -> List[Tuple]:
+        return list(run_insecure_query(user_input, pool=self.pool))
+
+    def handle(self, user_input: str, record: bool = True) -> HoneypotResult:
+        """
+        Run one input, exactly as given, through the guardrail and either the real
+        query or the decoy path.
+
+        Pass ``record=False`` when the caller audits the attempt itself (e.g. cached callers).
+        """
+        started = time.perf_counter()
+        decision = self.evaluate(user_input)
+        guardrail_ms = (time.perf_counter() - started) * 1000
+
+        rows: List[Tuple] = decoy_rows()
+        error = None
+        query_ms = 0.0
+        if decision.safe:
+            started = time.perf_counter()
+            try:
+                rows = self.query(user_input)
+            except sqlite3.Error as exc:
+                rows, error = [], f"Query failed: {exc}"
+            query_ms = (time.perf_counter() - started) * 1000
+
+        if record:
+            self.record_attempt(user_input, decision, guardrail_ms + query_ms)
+        return HoneypotResult(
+            input=user_input,
+            decision=decision,
+            rows=rows,
+            decoy=not decision.safe,
+            error=error,
+            timings={
+                "guardrail_ms": guardrail_ms,
+                "query_ms": query_ms,
+                "total_ms": guardrail_ms + query_ms,
+            },
+        )
+
+    def close(self) -> None:
+        if self.audit is not None:
+            self.audit.close()
+        self.pool.close()